@@ -0,0 +1,40 @@
+"""Indexes for team dashboard, customer orders and customer list queries
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_orders_assigned_status_created', 'orders',
+        ['assigned_to', 'status', sa.text('created_at DESC')], unique=False
+    )
+    op.create_index(
+        'ix_orders_customer_created', 'orders',
+        ['customer_id', sa.text('created_at DESC')], unique=False
+    )
+    
+    # Partial index is Postgres-only; SQLite dev databases skip it
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index(
+            'ix_users_role_customer', 'users', ['id'], unique=False,
+            postgresql_where=sa.text("role = 'customer'")
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_users_role_customer', table_name='users')
+    op.drop_index('ix_orders_customer_created', table_name='orders')
+    op.drop_index('ix_orders_assigned_status_created', table_name='orders')
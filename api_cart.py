@@ -1,14 +1,20 @@
 # File: api/cart.py
 from fastapi import APIRouter, Depends, HTTPException, Form, Query
+from fastapi.responses import ORJSONResponse, Response
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 import json
+import orjson
 
-from database import get_db
+from database import get_sync_db as get_db
 from models import Cart, MenuItem, Service, User
 from auth import get_current_user
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Fixed bodies for the cart badge poll and the clear action, encoded once
+EMPTY_CART_COUNT_BODY = orjson.dumps({"count": 0, "has_cart": False})
+CART_CLEARED_BODY = orjson.dumps({"success": True, "message": "Cart cleared"})
 
 @router.get("/")
 async def get_cart(
@@ -29,7 +35,7 @@ async def get_cart(
     
     # Parse cart items
     try:
-        items = json.loads(cart.items) if cart.items else []
+        items = orjson.loads(cart.items) if cart.items else []
     except json.JSONDecodeError:
         items = []
     
@@ -125,7 +131,7 @@ async def add_to_cart(
     
     # Parse current items
     try:
-        items = json.loads(cart.items) if cart.items else []
+        items = orjson.loads(cart.items) if cart.items else []
     except json.JSONDecodeError:
         items = []
     
@@ -151,7 +157,7 @@ async def add_to_cart(
     cart.total_amount += price * quantity
     
     # Update cart
-    cart.items = json.dumps(items)
+    cart.items = orjson.dumps(items).decode()
     db.commit()
     
     return {
@@ -183,7 +189,7 @@ async def update_cart_item(
     
     # Parse items
     try:
-        items = json.loads(cart.items)
+        items = orjson.loads(cart.items)
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid cart data")
     
@@ -220,7 +226,7 @@ async def update_cart_item(
     cart.total_amount += (quantity - old_quantity) * price
     
     # Update cart
-    cart.items = json.dumps(items)
+    cart.items = orjson.dumps(items).decode()
     
     # If cart is empty, delete it
     if not items:
@@ -257,7 +263,7 @@ async def remove_from_cart(
     
     # Parse items
     try:
-        items = json.loads(cart.items)
+        items = orjson.loads(cart.items)
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid cart data")
     
@@ -283,7 +289,7 @@ async def remove_from_cart(
     cart.total_amount -= price * removed_quantity
     
     # Update cart
-    cart.items = json.dumps(items)
+    cart.items = orjson.dumps(items).decode()
     
     # If cart is empty, delete it
     if not items:
@@ -315,10 +321,7 @@ async def clear_cart(
         db.delete(cart)
         db.commit()
     
-    return {
-        "success": True,
-        "message": "Cart cleared"
-    }
+    return Response(content=CART_CLEARED_BODY, media_type="application/json")
 
 @router.post("/transfer")
 async def transfer_cart(
@@ -344,7 +347,7 @@ async def transfer_cart(
     
     # Parse current items
     try:
-        items = json.loads(current_cart.items) if current_cart.items else []
+        items = orjson.loads(current_cart.items) if current_cart.items else []
     except json.JSONDecodeError:
         items = []
     
@@ -379,7 +382,7 @@ async def transfer_cart(
     if new_cart:
         # Merge with existing cart for new service
         try:
-            existing_items = json.loads(new_cart.items) if new_cart.items else []
+            existing_items = orjson.loads(new_cart.items) if new_cart.items else []
         except json.JSONDecodeError:
             existing_items = []
         
@@ -398,7 +401,7 @@ async def transfer_cart(
             if not found:
                 merged_items.append(item)
         
-        new_cart.items = json.dumps(merged_items)
+        new_cart.items = orjson.dumps(merged_items).decode()
         
         # Recalculate total
         total = 0
@@ -423,7 +426,7 @@ async def transfer_cart(
         new_cart = Cart(
             user_id=user.id,
             service_id=new_service_id,
-            items=json.dumps(available_items),
+            items=orjson.dumps(available_items).decode(),
             total_amount=total
         )
         db.add(new_cart)
@@ -456,13 +459,10 @@ async def get_cart_count(
     cart = db.query(Cart).filter(Cart.user_id == user.id).first()
     
     if not cart or not cart.items:
-        return {
-            "count": 0,
-            "has_cart": False
-        }
+        return Response(content=EMPTY_CART_COUNT_BODY, media_type="application/json")
     
     try:
-        items = json.loads(cart.items)
+        items = orjson.loads(cart.items)
         count = sum(item.get("quantity", 1) for item in items)
     except json.JSONDecodeError:
         count = 0
@@ -0,0 +1,79 @@
+from typing import List, Optional
+import logging
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional; without it every lookup goes to the DB
+    aioredis = None
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class RedisCache:
+    def __init__(self):
+        self.redis_url = settings.REDIS_URL
+        self.ttl = settings.CACHE_TTL
+        self.client = None
+
+        if aioredis is not None and self.redis_url:
+            try:
+                self.client = aioredis.from_url(self.redis_url, decode_responses=True)
+                logger.info("Redis cache initialized")
+            except Exception as e:
+                logger.error("Failed to initialize Redis cache: %s", e)
+
+    def is_configured(self) -> bool:
+        """Check if Redis is available"""
+        return self.client is not None
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached value
+        Returns: the value, or None on a miss or when Redis is unavailable
+        """
+        if not self.is_configured():
+            return None
+
+        try:
+            return await self.client.get(key)
+        except Exception as e:
+            logger.warning("Redis get failed for %s: %s", key, e)
+            return None
+
+    async def get_many(self, *keys: str) -> List[Optional[str]]:
+        """
+        Get several cached values in one round trip (MGET)
+        Returns: a value or None per key, all None when Redis is unavailable
+        """
+        if not self.is_configured() or not keys:
+            return [None] * len(keys)
+
+        try:
+            return await self.client.mget(keys)
+        except Exception as e:
+            logger.warning("Redis get failed for %s: %s", keys, e)
+            return [None] * len(keys)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        """Cache a value with an expiry; errors are logged and ignored"""
+        if not self.is_configured():
+            return
+
+        try:
+            await self.client.setex(key, ttl or self.ttl, value)
+        except Exception as e:
+            logger.warning("Redis set failed for %s: %s", key, e)
+
+    async def delete(self, *keys: str) -> None:
+        """Drop cached values; errors are logged and ignored"""
+        if not self.is_configured() or not keys:
+            return
+
+        try:
+            await self.client.delete(*keys)
+        except Exception as e:
+            logger.warning("Redis delete failed for %s: %s", keys, e)
+
+# Global cache instance
+cache = RedisCache()
@@ -1,7 +1,7 @@
 # File: config.py
 import os
-from typing import List
-from pydantic import BaseSettings
+from typing import List, Optional
+from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -63,8 +63,8 @@ class Settings(BaseSettings):
     # Google Maps
     GOOGLE_MAPS_API_KEY: str = os.getenv("GOOGLE_MAPS_API_KEY", "")
     
-    # Redis (for caching)
-    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    # Redis (for caching); opt-in, core.cache stays off unless this is set
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL") or None
     
     # Cache
     CACHE_TTL: int = 300  # 5 minutes
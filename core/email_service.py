@@ -50,11 +50,11 @@ class EmailService:
                 server.login(self.config.SMTP_USERNAME, self.config.SMTP_PASSWORD)
                 server.send_message(msg)
             
-            logger.info(f"Email sent successfully to {to_email}")
+            logger.info("Email sent successfully to %s", to_email)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {str(e)}")
+            logger.error("Failed to send email to %s: %s", to_email, e)
             return False
     
     def load_template(self, template_name: str, context: Dict[str, Any]) -> str:
@@ -1,10 +1,15 @@
 from fastapi import HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.requests import Request
+from sqlalchemy.exc import SQLAlchemyError
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# The generic 500 body never changes, so serialize it once
+INTERNAL_ERROR_BODY = orjson.dumps({"detail": "Internal server error"})
+
 class AppException(Exception):
     """Base application exception"""
     def __init__(self, message: str, status_code: int = 400):
@@ -14,21 +19,26 @@ class AppException(Exception):
 
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    
+    # Client errors are expected traffic (bad credentials, missing rows);
+    # answer them without walking the stack for a traceback
     if isinstance(exc, HTTPException):
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.detail}
         )
     elif isinstance(exc, AppException):
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.message}
         )
+    elif isinstance(exc, SQLAlchemyError):
+        logger.error("Database error: %s", exc, exc_info=True)
+    else:
+        logger.exception("Unhandled exception: %s", exc)
     
     # Generic error for production
-    return JSONResponse(
+    return Response(
+        content=INTERNAL_ERROR_BODY,
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={"detail": "Internal server error"}
+        media_type="application/json"
     )
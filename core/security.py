@@ -6,15 +6,29 @@ from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import os
+import time
 import secrets
 import string
 import re
 
-from database import get_db
-from models import User, UserSession
+from cachetools import TTLCache
+
+from database import get_sync_db as get_db
+from models.models import User, UserSession
 
 # Security configurations
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],  # argon2id for new hashes; bcrypt still verifies
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=2,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 http_bearer = HTTPBearer(auto_error=False)
 
@@ -23,6 +37,16 @@ SECRET_KEY = "your-secret-key-change-in-production"  # Should be in .env
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+ACCESS_TOKEN_EXPIRE_DELTA = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+REFRESH_TOKEN_EXPIRE_DELTA = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+# Validation patterns
+UPPERCASE_RE = re.compile(r"[A-Z]")
+LOWERCASE_RE = re.compile(r"[a-z]")
+DIGIT_RE = re.compile(r"\d")
+SPECIAL_CHAR_RE = re.compile(r"[!@#$%^&*(),.?\":{}|<>]")
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PHONE_RE = re.compile(r'^\+?[1-9]\d{1,14}$')
 
 class AuthHandler:
     @staticmethod
@@ -39,7 +63,7 @@ class AuthHandler:
         if expires_delta:
             expire = datetime.utcnow() + expires_delta
         else:
-            expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            expire = datetime.utcnow() + ACCESS_TOKEN_EXPIRE_DELTA
         
         to_encode.update({
             "exp": expire,
@@ -52,7 +76,7 @@ class AuthHandler:
     @staticmethod
     def create_refresh_token(data: Dict[str, Any]) -> str:
         to_encode = data.copy()
-        expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        expire = datetime.utcnow() + REFRESH_TOKEN_EXPIRE_DELTA
         
         to_encode.update({
             "exp": expire,
@@ -82,16 +106,16 @@ class AuthHandler:
         if len(password) < 8:
             return False, "Password must be at least 8 characters long"
         
-        if not re.search(r"[A-Z]", password):
+        if not UPPERCASE_RE.search(password):
             return False, "Password must contain at least one uppercase letter"
         
-        if not re.search(r"[a-z]", password):
+        if not LOWERCASE_RE.search(password):
             return False, "Password must contain at least one lowercase letter"
         
-        if not re.search(r"\d", password):
+        if not DIGIT_RE.search(password):
             return False, "Password must contain at least one digit"
         
-        if not re.search(r"[!@#$%^&*(),.?\":{}|<>]", password):
+        if not SPECIAL_CHAR_RE.search(password):
             return False, "Password must contain at least one special character"
         
         return True, "Password is strong"
@@ -99,14 +123,43 @@ class AuthHandler:
     @staticmethod
     def validate_email(email: str) -> bool:
         """Validate email format"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return EMAIL_RE.match(email) is not None
 
     @staticmethod
     def validate_phone(phone: str) -> bool:
         """Validate phone number format"""
-        pattern = r'^\+?[1-9]\d{1,14}$'
-        return re.match(pattern, phone) is not None
+        return PHONE_RE.match(phone) is not None
+
+# Module-level shortcuts used by crud/ and routers/
+verify_password = AuthHandler.verify_password
+get_password_hash = AuthHandler.get_password_hash
+
+# Password hashing is CPU-bound but releases the GIL, so it runs on this
+# thread pool off the event loop. Each argon2 hash holds memory_cost
+# (64 MiB) while it runs, so the pool size also caps that memory; every
+# hash in the process, main.py's logins included, goes through
+# run_password_hash.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_POOL = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+async def run_password_hash(func, *args):
+    """Run a password hashing call on PASSWORD_HASH_POOL"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(PASSWORD_HASH_POOL, func, *args)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password, run on PASSWORD_HASH_POOL"""
+    return await run_password_hash(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash, run on PASSWORD_HASH_POOL"""
+    return await run_password_hash(get_password_hash, password)
+
+# sha256(token) -> verified access-token payload. Pages fan out into several
+# HTMX calls with the same cookie; within the TTL those skip jwt.decode and
+# the session-activity write. Entries are only trusted until the token's exp.
+TOKEN_CACHE_TTL = 30
+_verified_tokens: TTLCache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL)
 
 async def get_current_user(
     request: Request,
@@ -127,18 +180,23 @@ async def get_current_user(
     if not token:
         return None
     
-    # Decode token
-    payload = AuthHandler.decode_token(token)
-    if not payload:
-        return None
+    token_key = hashlib.sha256(token.encode()).digest()
+    payload = _verified_tokens.get(token_key)
+    recently_seen = payload is not None and payload["exp"] > time.time()
     
-    username = payload.get("sub")
-    if not username:
-        return None
+    if not recently_seen:
+        # Decode token
+        payload = AuthHandler.decode_token(token)
+        if not payload:
+            return None
+        
+        # Check token type
+        if not payload.get("sub") or payload.get("type") != "access":
+            return None
+        
+        _verified_tokens[token_key] = payload
     
-    # Check token type
-    if payload.get("type") != "access":
-        return None
+    username = payload["sub"]
     
     # Get user from database
     user = db.query(User).filter(
@@ -147,9 +205,10 @@ async def get_current_user(
     ).first()
     
     if user:
-        # Update last activity in session if session token exists
+        # Update last activity in session if session token exists; once per
+        # TOKEN_CACHE_TTL is enough resolution for an activity timestamp
         session_token = payload.get("session_token")
-        if session_token:
+        if session_token and not recently_seen:
             session = db.query(UserSession).filter(
                 UserSession.session_token == session_token,
                 UserSession.is_active == True
@@ -178,6 +237,18 @@ async def get_current_active_user(
         )
     return current_user
 
+async def require_admin(
+    current_user: Optional[User] = Depends(get_current_user)
+) -> User:
+    """Admin-only routes: rejects with 403 before the route's other
+    dependencies (such as its DB session) are resolved"""
+    if not current_user or current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized"
+        )
+    return current_user
+
 def require_role(*roles: str):
     """Decorator to require specific roles"""
     def role_checker(user: User = Depends(get_current_active_user)):
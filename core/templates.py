@@ -0,0 +1,44 @@
+import os
+import tempfile
+import logging
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, TemplateSyntaxError
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = "templates"
+
+# One environment for the whole app, so every template is parsed and
+# compiled once per worker no matter how many routers render it.
+# Templates don't change under a running worker: skip the mtime check on
+# every lookup and share compiled bytecode across workers and restarts.
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=True,  # what Jinja2Templates(directory=...) would set up
+    auto_reload=False,
+    cache_size=400,
+    bytecode_cache=FileSystemBytecodeCache(
+        os.getenv("JINJA_CACHE_DIR", tempfile.gettempdir())
+    ),
+)
+
+templates = Jinja2Templates(env=env)
+
+def precompile_templates() -> int:
+    """Load every template into the environment cache.
+
+    Called on startup so the first visitor to each page doesn't pay for
+    parsing (or, with a warm bytecode cache, for reading the bytecode).
+    Returns the number compiled. A template that fails to parse is logged
+    and skipped, so one broken page can't stop the rest of startup.
+    """
+    compiled = 0
+    for name in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(name)
+        except TemplateSyntaxError:
+            logger.exception("Template %s failed to compile", name)
+        else:
+            compiled += 1
+    return compiled
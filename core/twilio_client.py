@@ -8,6 +8,10 @@ from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+def mask_phone(phone_number: str) -> str:
+    """Keep only the last four digits of a number for logging"""
+    return "***" + phone_number[-4:]
+
 class TwilioClient:
     def __init__(self):
         self.account_sid = settings.TWILIO_ACCOUNT_SID
@@ -20,7 +24,7 @@ class TwilioClient:
                 self.client = Client(self.account_sid, self.auth_token)
                 logger.info("Twilio client initialized successfully")
             except Exception as e:
-                logger.error(f"Failed to initialize Twilio client: {e}")
+                logger.error("Failed to initialize Twilio client: %s", e)
     
     def is_configured(self) -> bool:
         """Check if Twilio is configured"""
@@ -54,14 +58,14 @@ class TwilioClient:
                 to=phone_number
             )
             
-            logger.info(f"SMS sent to {phone_number}, SID: {message.sid}")
+            logger.info("SMS sent to %s, SID: %s", mask_phone(phone_number), message.sid)
             return True
             
         except TwilioRestException as e:
-            logger.error(f"Twilio error: {e}")
+            logger.error("Twilio error: %s", e)
             return False
         except Exception as e:
-            logger.error(f"Failed to send SMS: {e}")
+            logger.error("Failed to send SMS: %s", e)
             return False
     
     def send_plan_notification(self, phone_number: str, description: str) -> bool:
@@ -90,11 +94,11 @@ class TwilioClient:
                 to=phone_number
             )
             
-            logger.info(f"Plan notification sent to {phone_number}")
+            logger.info("Plan notification sent to %s", mask_phone(phone_number))
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send plan notification: {e}")
+            logger.error("Failed to send plan notification: %s", e)
             return False
 
 # Global Twilio client instance
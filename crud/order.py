@@ -13,6 +13,18 @@ from core.security import generate_otp
 
 # ========== ORDER CREATION ==========
 
+async def get_available_menu_items(db: AsyncSession, menu_item_ids) -> Dict[int, MenuItem]:
+    """Fetch the available menu items among the given ids in one query, keyed by id"""
+    result = await db.execute(
+        select(MenuItem).where(
+            and_(
+                MenuItem.id.in_(set(menu_item_ids)),
+                MenuItem.is_available == True
+            )
+        )
+    )
+    return {menu_item.id: menu_item for menu_item in result.scalars()}
+
 async def create_order_from_schema(
     db: AsyncSession,
     customer_id: int,
@@ -23,17 +35,13 @@ async def create_order_from_schema(
     total_amount = 0.0
     order_items = []
     
+    # Price every line from a single lookup instead of one SELECT per item
+    menu_items = await get_available_menu_items(
+        db, [item_data.menu_item_id for item_data in order_data.items]
+    )
+    
     for item_data in order_data.items:
-        # Get menu item
-        result = await db.execute(
-            select(MenuItem).where(
-                and_(
-                    MenuItem.id == item_data.menu_item_id,
-                    MenuItem.is_available == True
-                )
-            )
-        )
-        menu_item = result.scalar_one_or_none()
+        menu_item = menu_items.get(item_data.menu_item_id)
         
         if not menu_item:
             raise ValueError(f"Menu item {item_data.menu_item_id} not found or unavailable")
@@ -89,17 +97,13 @@ async def create_order(
     total_amount = 0.0
     order_items = []
     
+    # Price every line from a single lookup instead of one SELECT per item
+    menu_items = await get_available_menu_items(
+        db, [menu_item_id for menu_item_id, _ in items]
+    )
+    
     for menu_item_id, quantity in items:
-        # Get menu item
-        result = await db.execute(
-            select(MenuItem).where(
-                and_(
-                    MenuItem.id == menu_item_id,
-                    MenuItem.is_available == True
-                )
-            )
-        )
-        menu_item = result.scalar_one_or_none()
+        menu_item = menu_items.get(menu_item_id)
         
         if not menu_item:
             return None
@@ -139,9 +143,9 @@ async def get_order_by_id(db: AsyncSession, order_id: int) -> Optional[Order]:
     result = await db.execute(
         select(Order)
         .options(
-            selectinload(Order.customer),
-            selectinload(Order.service),
-            selectinload(Order.assigned_to_user),
+            joinedload(Order.customer),
+            joinedload(Order.service),
+            joinedload(Order.team_member),
             selectinload(Order.order_items).joinedload(OrderItem.menu_item)
         )
         .where(Order.id == order_id)
@@ -153,8 +157,8 @@ async def get_order_by_number(db: AsyncSession, order_number: str) -> Optional[O
     result = await db.execute(
         select(Order)
         .options(
-            selectinload(Order.customer),
-            selectinload(Order.service),
+            joinedload(Order.customer),
+            joinedload(Order.service),
             selectinload(Order.order_items).joinedload(OrderItem.menu_item)
         )
         .where(Order.order_number == order_number)
@@ -166,7 +170,7 @@ async def get_orders_by_customer(db: AsyncSession, customer_id: int, skip: int =
     result = await db.execute(
         select(Order)
         .options(
-            selectinload(Order.service),
+            joinedload(Order.service),
             selectinload(Order.order_items).joinedload(OrderItem.menu_item)
         )
         .where(Order.customer_id == customer_id)
@@ -179,22 +183,22 @@ async def get_orders_by_customer(db: AsyncSession, customer_id: int, skip: int =
 async def get_orders_by_customer_mobile(db: AsyncSession, mobile: str, skip: int = 0, limit: int = 50) -> List[Order]:
     """Get orders by customer mobile number"""
     # First get user by mobile
-    from crud.user import get_user_by_mobile
-    user = await get_user_by_mobile(db, mobile)
+    from crud.user import get_user_id_by_mobile
+    user_id = await get_user_id_by_mobile(db, mobile)
     
-    if not user:
+    if user_id is None:
         return []
     
     # Then get their orders
-    return await get_orders_by_customer(db, user.id, skip, limit)
+    return await get_orders_by_customer(db, user_id, skip, limit)
 
 async def get_orders_by_team_member(db: AsyncSession, team_member_id: int, skip: int = 0, limit: int = 50) -> List[Order]:
     """Get orders assigned to a team member"""
     result = await db.execute(
         select(Order)
         .options(
-            selectinload(Order.customer),
-            selectinload(Order.service),
+            joinedload(Order.customer),
+            joinedload(Order.service),
             selectinload(Order.order_items).joinedload(OrderItem.menu_item)
         )
         .where(and_(
@@ -220,9 +224,9 @@ async def get_all_orders(
     
     # Build query
     query = select(Order).options(
-        selectinload(Order.customer),
-        selectinload(Order.service),
-        selectinload(Order.assigned_to_user)
+        joinedload(Order.customer),
+        joinedload(Order.service),
+        joinedload(Order.team_member)
     )
     
     # Apply filters
@@ -237,10 +241,10 @@ async def get_all_orders(
     # Filter by customer mobile if provided
     if customer_mobile:
         # Get user by mobile
-        from crud.user import get_user_by_mobile
-        user = await get_user_by_mobile(db, customer_mobile)
-        if user:
-            conditions.append(Order.customer_id == user.id)
+        from crud.user import get_user_id_by_mobile
+        user_id = await get_user_id_by_mobile(db, customer_mobile)
+        if user_id is not None:
+            conditions.append(Order.customer_id == user_id)
         else:
             # Return empty if user not found
             return [], 0
@@ -486,8 +490,8 @@ async def get_recent_orders(
     result = await db.execute(
         select(Order)
         .options(
-            selectinload(Order.customer),
-            selectinload(Order.service)
+            joinedload(Order.customer),
+            joinedload(Order.service)
         )
         .where(Order.created_at >= date_from)
         .order_by(desc(Order.created_at))
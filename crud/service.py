@@ -1,8 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_
+from sqlalchemy import select, update, and_, func
 from sqlalchemy.orm import selectinload
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+import hashlib
+
+from cachetools import TTLCache
 
 from models.models import Service, MenuItem
 
@@ -18,6 +21,7 @@ async def create_service(db: AsyncSession, name: str, description: Optional[str]
     db.add(db_service)
     await db.commit()
     await db.refresh(db_service)
+    _services_changed(db_service.id)
     return db_service
 
 async def get_service_by_id(db: AsyncSession, service_id: int) -> Optional[Service]:
@@ -29,6 +33,58 @@ async def get_service_by_id(db: AsyncSession, service_id: int) -> Optional[Servi
     )
     return result.scalar_one_or_none()
 
+# service id -> Service (with menu_items loaded), for read-only page renders.
+# Entries are detached from their session, so callers that modify the
+# service must use get_service_by_id; every write below invalidates.
+_service_cache: TTLCache = TTLCache(maxsize=512, ttl=60)
+
+# (skip, limit) -> active services list, for the services pages
+_service_lists: TTLCache = TTLCache(maxsize=64, ttl=60)
+
+# Last catalogue version this process saw; when another worker writes, the
+# version moves and the caches above are dropped on the next lookup
+_seen_version: Optional[str] = None
+
+def _services_changed(service_id: Optional[int] = None) -> None:
+    """Invalidate cached services after a write (all of them if no id is given)"""
+    _service_lists.clear()
+    if service_id is None:
+        _service_cache.clear()
+    else:
+        _service_cache.pop(service_id, None)
+
+async def services_version(db: AsyncSession) -> str:
+    """Current version of the service catalogue, shared by every worker.
+
+    Derived from the tables themselves (latest updated_at and row count of
+    services and menu items) in one small query, so a write in any process
+    changes it. Also drops this process's cached services when it moves.
+    """
+    global _seen_version
+    row = (await db.execute(select(
+        select(func.max(Service.updated_at)).scalar_subquery(),
+        select(func.count(Service.id)).scalar_subquery(),
+        select(func.max(MenuItem.updated_at)).scalar_subquery(),
+        select(func.count(MenuItem.id)).scalar_subquery(),
+    ))).one()
+    version = hashlib.blake2b(repr(tuple(row)).encode(), digest_size=8).hexdigest()
+    if version != _seen_version:
+        _seen_version = version
+        _service_lists.clear()
+        _service_cache.clear()
+    return version
+
+async def get_service_cached(db: AsyncSession, service_id: int) -> Optional[Service]:
+    """get_service_by_id for read-only use, cached briefly"""
+    try:
+        return _service_cache[service_id]
+    except KeyError:
+        pass
+    
+    service = await get_service_by_id(db, service_id)
+    _service_cache[service_id] = service
+    return service
+
 async def get_all_services(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Service]:
     """Get all active services"""
     result = await db.execute(
@@ -40,15 +96,34 @@ async def get_all_services(db: AsyncSession, skip: int = 0, limit: int = 100) ->
     )
     return result.scalars().all()
 
+async def get_all_services_cached(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Service]:
+    """get_all_services for read-only page renders; refetched only after a write"""
+    key = (skip, limit)
+    try:
+        return _service_lists[key]
+    except KeyError:
+        pass
+    
+    services = await get_all_services(db, skip, limit)
+    _service_lists[key] = services
+    return services
+
 async def update_service(db: AsyncSession, service_id: int, update_data: dict) -> Optional[Service]:
     """Update service"""
-    await db.execute(
+    # RETURNING hands back the updated row, so there's no follow-up SELECT;
+    # the is_active guard keeps the 404 for soft-deleted services
+    result = await db.execute(
         update(Service)
-        .where(Service.id == service_id)
+        .where(and_(Service.id == service_id, Service.is_active == True))
         .values(**update_data)
+        .returning(Service)
+        .options(selectinload(Service.menu_items))
+        .execution_options(populate_existing=True)
     )
+    service = result.scalar_one_or_none()
     await db.commit()
-    return await get_service_by_id(db, service_id)
+    _services_changed(service_id)
+    return service
 
 async def delete_service(db: AsyncSession, service_id: int) -> bool:
     """Soft delete service"""
@@ -56,6 +131,7 @@ async def delete_service(db: AsyncSession, service_id: int) -> bool:
     if service:
         service.is_active = False
         await db.commit()
+        _services_changed(service_id)
         return True
     return False
 
@@ -73,6 +149,7 @@ async def create_menu_item(db: AsyncSession, service_id: int, name: str, descrip
     db.add(db_item)
     await db.commit()
     await db.refresh(db_item)
+    _services_changed(service_id)
     return db_item
 
 async def get_menu_item_by_id(db: AsyncSession, item_id: int) -> Optional[MenuItem]:
@@ -96,13 +173,18 @@ async def get_menu_items_by_service(db: AsyncSession, service_id: int) -> List[M
 
 async def update_menu_item(db: AsyncSession, item_id: int, update_data: dict) -> Optional[MenuItem]:
     """Update menu item"""
-    await db.execute(
+    result = await db.execute(
         update(MenuItem)
         .where(MenuItem.id == item_id)
         .values(**update_data)
+        .returning(MenuItem)
+        .execution_options(populate_existing=True)
     )
+    menu_item = result.scalar_one_or_none()
     await db.commit()
-    return await get_menu_item_by_id(db, item_id)
+    # The item may have moved between services; drop every cached menu
+    _services_changed()
+    return menu_item
 
 async def delete_menu_item(db: AsyncSession, item_id: int) -> bool:
     """Soft delete menu item"""
@@ -110,6 +192,7 @@ async def delete_menu_item(db: AsyncSession, item_id: int) -> bool:
     if item:
         item.is_available = False
         await db.commit()
+        _services_changed(item.service_id)
         return True
     return False
 
@@ -26,14 +26,19 @@ async def create_user_session(
     return db_session
 
 async def update_user_session_logout(db: AsyncSession, session_id: int) -> bool:
-    """Update session logout time"""
-    await db.execute(
+    """Update session logout time; False if the session is unknown or already closed"""
+    # One primary-key UPDATE; the IS NULL guard keeps a replayed logout
+    # from overwriting the original logout time
+    result = await db.execute(
         update(UserSession)
-        .where(UserSession.id == session_id)
+        .where(and_(
+            UserSession.id == session_id,
+            UserSession.logout_time.is_(None)
+        ))
         .values(logout_time=datetime.utcnow())
     )
     await db.commit()
-    return True
+    return result.rowcount > 0
 
 async def update_session_logout_by_user(db: AsyncSession, user_id: int) -> bool:
     """Update all active sessions for a user to logout"""
@@ -95,14 +100,14 @@ async def get_user_sessions_by_mobile(
 ) -> Tuple[List[UserSession], int]:
     """Get user sessions by mobile number"""
     # First get user by mobile
-    from crud.user import get_user_by_mobile
-    user = await get_user_by_mobile(db, mobile)
+    from crud.user import get_user_id_by_mobile
+    user_id = await get_user_id_by_mobile(db, mobile)
     
-    if not user:
+    if user_id is None:
         return [], 0
     
     # Then get their sessions
-    return await get_user_sessions(db, user.id, date_from, date_to, skip, limit)
+    return await get_user_sessions(db, user_id, date_from, date_to, skip, limit)
 
 async def get_all_user_sessions(
     db: AsyncSession,
@@ -5,29 +5,29 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime, date, timedelta
 import re
 
+from cachetools import TTLCache
+
 from models.models import User, Order, UserSession
-from schemas.schemas import UserCreate, UserRole, UserLogin, UserProfileUpdate, PasswordChange
-from core.security import get_password_hash, verify_password
+from schemas.schemas import UserCreate, UserRole, UserLogin, UserProfileUpdate, PasswordChange, NON_DIGIT_BYTES
+from core.security import get_password_hash, verify_password, verify_password_async, get_password_hash_async
+from core.cache import cache
 
 # ========== MOBILE AUTHENTICATION FUNCTIONS ==========
 
+# Checked against when no user matches, keeping failed-login timing uniform
+DUMMY_PASSWORD_HASH = get_password_hash("dummy-password-for-timing-parity")
+
+# 10 digits starting with a valid Indian prefix (6, 7, 8 or 9)
+MOBILE_RE = re.compile(r'[6-9]\d{9}')
+
 def clean_mobile_number(mobile: str) -> str:
     """Clean mobile number by removing non-digit characters"""
-    return re.sub(r'\D', '', mobile)
+    return mobile.encode('ascii', 'ignore').translate(None, NON_DIGIT_BYTES).decode('ascii')
 
 def validate_mobile_number(mobile: str) -> bool:
     """Validate mobile number format"""
     clean_mobile = clean_mobile_number(mobile)
-    
-    # Check if it's 10 digits
-    if len(clean_mobile) != 10:
-        return False
-    
-    # Check if it starts with valid Indian prefix
-    if not clean_mobile.startswith(('6', '7', '8', '9')):
-        return False
-    
-    return True
+    return MOBILE_RE.fullmatch(clean_mobile) is not None
 
 async def get_user_by_mobile(db: AsyncSession, mobile: str) -> Optional[User]:
     """Get user by mobile number"""
@@ -38,24 +38,62 @@ async def get_user_by_mobile(db: AsyncSession, mobile: str) -> Optional[User]:
     )
     return result.scalar_one_or_none()
 
-async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
-    """Create new user with mobile authentication"""
-    # Clean and validate mobile number
-    clean_mobile = clean_mobile_number(user_data.mobile)
+# mobile -> user id, registered mobiles only: a cached miss would keep
+# hiding a user who just registered through another worker. Ids never
+# change, so only a change of mobile needs to invalidate entries.
+_user_id_by_mobile: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+async def get_user_id_by_mobile(db: AsyncSession, mobile: str) -> Optional[int]:
+    """Get just the user id for a mobile number, cached briefly"""
+    clean_mobile = clean_mobile_number(mobile)
+    try:
+        return _user_id_by_mobile[clean_mobile]
+    except KeyError:
+        pass
     
-    if not validate_mobile_number(clean_mobile):
-        raise ValueError("Invalid mobile number format")
+    result = await db.execute(
+        select(User.id).where(User.mobile == clean_mobile)
+    )
+    user_id = result.scalar_one_or_none()
+    if user_id is not None:
+        _user_id_by_mobile[clean_mobile] = user_id
+    return user_id
+
+async def get_users_by_mobile_or_email(db: AsyncSession, mobile: str, email: Optional[str] = None) -> List[User]:
+    """Get users matching either the mobile number or the email (at most one each)"""
+    condition = User.mobile == mobile
+    if email:
+        condition = or_(condition, User.email == email)
     
-    # Check if user already exists
-    existing_user = await get_user_by_mobile(db, clean_mobile)
-    if existing_user:
+    result = await db.execute(
+        select(User).where(condition).limit(2)
+    )
+    return result.scalars().all()
+
+async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
+    """Create new user with mobile authentication"""
+    # UserCreate.validate_mobile has already stripped and checked the number
+    clean_mobile = user_data.mobile
+
+    # Known-taken mobiles/emails are cached, so repeat attempts skip the DB;
+    # both keys are fetched in one round trip
+    taken_keys = [f"user:mobile:{clean_mobile}"]
+    if user_data.email:
+        taken_keys.append(f"user:email:{user_data.email}")
+    mobile_taken, *email_taken = await cache.get_many(*taken_keys)
+    if mobile_taken:
         raise ValueError(f"User with mobile {clean_mobile} already exists")
+    if any(email_taken):
+        raise ValueError(f"User with email {user_data.email} already exists")
     
-    # Check if email is provided and unique
-    if user_data.email:
-        existing_email_user = await get_user_by_email(db, user_data.email)
-        if existing_email_user:
-            raise ValueError(f"User with email {user_data.email} already exists")
+    # Check mobile and email uniqueness in a single round trip
+    conflicts = await get_users_by_mobile_or_email(db, clean_mobile, user_data.email)
+    if any(existing_user.mobile == clean_mobile for existing_user in conflicts):
+        await cache.set(f"user:mobile:{clean_mobile}", "1")
+        raise ValueError(f"User with mobile {clean_mobile} already exists")
+    if conflicts:
+        await cache.set(f"user:email:{user_data.email}", "1")
+        raise ValueError(f"User with email {user_data.email} already exists")
     
     # Create user
     db_user = User(
@@ -66,24 +104,24 @@ async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         role=user_data.role.value if hasattr(user_data.role, 'value') else user_data.role
     )
     
-    # Set password using model method
-    db_user.set_password(user_data.password)
+    # Hash off the event loop; argon2 is deliberately slow
+    db_user.password_hash = await get_password_hash_async(user_data.password)
     
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
+    await cache.set(f"user:mobile:{clean_mobile}", "1")
+    if db_user.email:
+        await cache.set(f"user:email:{db_user.email}", "1")
     return db_user
 
 async def authenticate_user(db: AsyncSession, mobile: str, password: str) -> Optional[User]:
     """Authenticate user with mobile and password"""
     user = await get_user_by_mobile(db, mobile)
-    if not user:
-        return None
-    
-    if not user.verify_password(password):
-        return None
+    # Always pay for one hash check so an unknown mobile isn't faster to reject
+    password_ok = await verify_password_async(password, user.password_hash if user else DUMMY_PASSWORD_HASH)
     
-    if not user.is_active:
+    if not (user and password_ok and user.is_active):
         return None
     
     return user
@@ -91,13 +129,10 @@ async def authenticate_user(db: AsyncSession, mobile: str, password: str) -> Opt
 async def authenticate_user_with_email(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate user with email and password (backward compatibility)"""
     user = await get_user_by_email(db, email)
-    if not user:
-        return None
+    # Always pay for one hash check so an unknown email isn't faster to reject
+    password_ok = await verify_password_async(password, user.password_hash if user else DUMMY_PASSWORD_HASH)
     
-    if not user.verify_password(password):
-        return None
-    
-    if not user.is_active:
+    if not (user and password_ok and user.is_active):
         return None
     
     return user
@@ -143,6 +178,10 @@ async def update_user(db: AsyncSession, user_id: int, update_data: dict) -> Opti
         .values(**update_data)
     )
     await db.commit()
+    if 'mobile' in update_data:
+        # Drop the entry for the old number, which still maps to this user
+        for mobile in [m for m, cached_id in _user_id_by_mobile.items() if cached_id == user_id]:
+            _user_id_by_mobile.pop(mobile, None)
     return await get_user_by_id(db, user_id)
 
 async def delete_user(db: AsyncSession, user_id: int) -> bool:
@@ -151,6 +190,10 @@ async def delete_user(db: AsyncSession, user_id: int) -> bool:
     if user:
         user.is_active = False
         await db.commit()
+        taken_keys = [f"user:mobile:{user.mobile}"]
+        if user.email:
+            taken_keys.append(f"user:email:{user.email}")
+        await cache.delete(*taken_keys)
         return True
     return False
 
@@ -165,13 +208,23 @@ async def get_all_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> Li
     )
     return result.scalars().all()
 
-async def get_users_by_role(db: AsyncSession, role: UserRole, skip: int = 0, limit: int = 100) -> List[User]:
-    """Get users by role"""
+async def get_users_by_role(
+    db: AsyncSession,
+    role: UserRole,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None
+) -> List[User]:
+    """Get users by role, by name; with after_id (the last id seen), the
+    next page in id order instead, without an OFFSET scan"""
+    query = select(User).where(and_(User.role == role.value, User.is_active == True))
+    if after_id is not None:
+        # Keyset pages walk ix_users_role_customer for the customer list
+        query = query.where(User.id > after_id).order_by(User.id)
+    else:
+        query = query.order_by(User.name)
     result = await db.execute(
-        select(User)
-        .where(and_(User.role == role.value, User.is_active == True))
-        .order_by(User.name)
-        .offset(skip)
+        query.offset(skip)
         .limit(limit)
     )
     return result.scalars().all()
@@ -228,8 +281,11 @@ async def update_user_profile(db: AsyncSession, user_id: int, profile_data: User
         update_fields['address'] = profile_data.address
     
     if update_fields:
+        old_email = user.email
         update_fields['updated_at'] = datetime.utcnow()
         await update_user(db, user_id, update_fields)
+        if old_email and update_fields.get('email', old_email) != old_email:
+            await cache.delete(f"user:email:{old_email}")
     
     return await get_user_by_id(db, user_id)
 
@@ -240,11 +296,11 @@ async def change_user_password(db: AsyncSession, user_id: int, password_data: Pa
         return False
     
     # Verify current password
-    if not user.verify_password(password_data.current_password):
+    if not await verify_password_async(password_data.current_password, user.password_hash):
         return False
     
     # Set new password
-    user.set_password(password_data.new_password)
+    user.password_hash = await get_password_hash_async(password_data.new_password)
     user.updated_at = datetime.utcnow()
     
     await db.commit()
@@ -257,7 +313,7 @@ async def update_user_mobile(db: AsyncSession, user_id: int, new_mobile: str, pa
         return False
     
     # Verify password
-    if not user.verify_password(password):
+    if not await verify_password_async(password, user.password_hash):
         return False
     
     # Clean and validate new mobile
@@ -271,10 +327,14 @@ async def update_user_mobile(db: AsyncSession, user_id: int, new_mobile: str, pa
         raise ValueError(f"Mobile number {clean_mobile} is already registered")
     
     # Update mobile
+    old_mobile = user.mobile
     user.mobile = clean_mobile
     user.updated_at = datetime.utcnow()
     
     await db.commit()
+    _user_id_by_mobile.pop(old_mobile, None)
+    _user_id_by_mobile.pop(clean_mobile, None)
+    await cache.delete(f"user:mobile:{old_mobile}")
     return True
 
 async def search_users(db: AsyncSession, search_term: str, skip: int = 0, limit: int = 50) -> List[User]:
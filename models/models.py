@@ -1,6 +1,6 @@
 
 # File: models.py
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, Enum, JSON, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -69,6 +69,15 @@ class User(Base):
     sessions = relationship("UserSession", back_populates="user")
     payments = relationship("Payment", back_populates="user")
     addresses = relationship("UserAddress", back_populates="user")
+    
+    __table_args__ = (
+        # Serves the keyset pages of get_users_by_role(CUSTOMER, after_id=...):
+        # finds the next customer ids in order; the rows come from the table
+        Index(
+            "ix_users_role_customer", "id",
+            postgresql_where=text("role = 'customer'"),
+        ),
+    )
 
 class UserAddress(Base):
     __tablename__ = "user_addresses"
@@ -224,6 +233,13 @@ class Order(Base):
     order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
     payments = relationship("Payment", back_populates="order")
     reviews = relationship("Review", back_populates="order")
+    
+    __table_args__ = (
+        # Team dashboard: active orders for one assignee, oldest first
+        Index("ix_orders_assigned_status_created", assigned_to, status, created_at.desc()),
+        # Customer detail / my orders: newest orders for one customer
+        Index("ix_orders_customer_created", customer_id, created_at.desc()),
+    )
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -318,7 +334,7 @@ class UserSession(Base):
     __tablename__ = "user_sessions"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     session_token = Column(String(255), unique=True, nullable=False)
     
     # Session details
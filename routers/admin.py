@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Form, UploadFile, File
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 import json
@@ -14,37 +13,27 @@ from crud.session import get_online_time_report, get_all_user_sessions
 from crud.service import get_all_services
 from crud.order import get_all_orders, get_order_statistics
 from schemas.schemas import UserCreate, UserRole, OrderStatus
-from core.security import get_current_user, get_password_hash
+from core.templates import templates
+from core.security import require_admin, get_password_hash
 from utils.file_upload import save_upload_file
 from core.twilio_client import twilio_client
 
-router = APIRouter(tags=["admin"])
-templates = Jinja2Templates(directory="templates")
+router = APIRouter(tags=["admin"], default_response_class=ORJSONResponse)
 
 @router.get("/admin/dashboard", response_class=HTMLResponse)
 async def admin_dashboard(
     request: Request,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Admin dashboard"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    # Get statistics
+    # One after another on the request's session: a page load holds a
+    # single pooled connection, and the rows stay attached while rendering
     order_stats = await get_order_statistics(db)
-    
-    # Get recent orders
     recent_orders, _ = await get_all_orders(db, limit=10)
-    
-    # Get team members
     team_members = await get_users_by_role(db, UserRole.TEAM_MEMBER, limit=10)
-    
-    # Get customers
     customers = await get_users_by_role(db, UserRole.CUSTOMER, limit=10)
-    
-    # Get online time report
     online_report = await get_online_time_report(db)
     
     return templates.TemplateResponse(
@@ -63,14 +52,11 @@ async def admin_dashboard(
 @router.get("/admin/team-members", response_class=HTMLResponse)
 async def admin_team_members(
     request: Request,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Team members management page"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     team_members = await get_users_by_role(db, UserRole.TEAM_MEMBER, limit=1000)
     
     return templates.TemplateResponse(
@@ -90,14 +76,11 @@ async def admin_create_team_member(
     email: Optional[str] = Form(None),
     phone: str = Form(...),
     password: str = Form(...),
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new team member (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     # Create user data
     user_data = UserCreate(
         name=name,
@@ -127,14 +110,11 @@ async def admin_update_team_member(
     username: str = Form(...),
     email: Optional[str] = Form(None),
     phone: str = Form(...),
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update team member (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     update_data = {
         "name": name,
         "username": username,
@@ -158,14 +138,11 @@ async def admin_update_team_member(
 @router.delete("/admin/team-members/{member_id}")
 async def admin_delete_team_member(
     member_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete team member (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     success = await delete_user(db, member_id)
     
     if not success:
@@ -178,14 +155,11 @@ async def admin_online_time_report(
     request: Request,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Online time report (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     from datetime import datetime
     date_from_obj = datetime.strptime(date_from, "%Y-%m-%d") if date_from else None
     date_to_obj = datetime.strptime(date_to, "%Y-%m-%d") if date_to else None
@@ -207,14 +181,11 @@ async def admin_user_sessions_report(
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
     page: int = 1,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """User sessions report (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     from datetime import datetime
     date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
     date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
@@ -250,13 +221,10 @@ async def admin_user_sessions_report(
 @router.post("/admin/upload")
 async def admin_upload_file(
     file: UploadFile = File(...),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin)
 ):
     """Upload file (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     file_url = await save_upload_file(file, "admin")
     
     if not file_url:
@@ -1,20 +1,7 @@
 # In routers/auth.py - Add these functions
-
-# Register page
-@router.get("/register", response_class=HTMLResponse)
-async def register_page(request: Request):
-    return templates.TemplateResponse(
-        "register.html",
-        {"request": request, "title": "Register - Bite Me Buddy"}
-    )
-
-# Login page
-@router.get("/login", response_class=HTMLResponse)
-async def login_page(request: Request):
-    return templates.TemplateResponse(
-        "login.html",
-        {"request": request, "title": "Login - Bite Me Buddy"}
-    )
+#
+# /register, /login and /admin-login are served by main.py (cached static
+# pages, see static_page); only routes main.py lacks belong here.
 
 # Team login page
 @router.get("/team-login", response_class=HTMLResponse)
@@ -23,11 +10,3 @@ async def team_login_page(request: Request):
         "team_login.html",
         {"request": request, "title": "Team Member Login"}
     )
-
-# Admin login page (from secret clock)
-@router.get("/admin-login", response_class=HTMLResponse)
-async def admin_login_page(request: Request):
-    return templates.TemplateResponse(
-        "admin_login.html",
-        {"request": request, "title": "Admin Login"}
-    )
\ No newline at end of file
@@ -1,24 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, Form
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
-import json
+from pydantic import TypeAdapter, ValidationError
 
 from database import get_db
 from crud.order import (
     create_order, get_order_by_id, get_orders_by_customer,
     update_order_status, assign_order, generate_order_otp,
-    verify_order_otp, get_order_statistics
+    verify_order_otp, get_order_statistics, get_all_orders
 )
-from crud.service import get_service_by_id
-from crud.user import get_user_by_id
-from core.security import get_current_user
+from crud.service import get_service_cached
+from crud.user import get_user_by_id, get_users_by_role
+from core.templates import templates
+from core.security import get_current_user, require_admin
 from core.twilio_client import twilio_client
-from schemas.schemas import OrderStatus
+from schemas.schemas import OrderStatus, OrderItemIn, UserRole
 
-router = APIRouter(tags=["orders"])
-templates = Jinja2Templates(directory="templates")
+router = APIRouter(tags=["orders"], default_response_class=ORJSONResponse)
+
+# Parses and validates the posted cart JSON in one pass
+ORDER_ITEMS_ADAPTER = TypeAdapter(List[OrderItemIn])
 
 @router.get("/cart", response_class=HTMLResponse)
 async def cart_page(
@@ -34,7 +36,7 @@ async def cart_page(
     
     service = None
     if service_id:
-        service = await get_service_by_id(db, service_id)
+        service = await get_service_cached(db, service_id)
     
     return templates.TemplateResponse(
         "cart.html",
@@ -63,10 +65,16 @@ async def create_new_order(
     
     # Parse items
     try:
-        items_data = json.loads(items_json)
-        items = [(item["id"], item["quantity"]) for item in items_data]
-    except:
-        raise HTTPException(status_code=400, detail="Invalid items data")
+        items_data = ORDER_ITEMS_ADAPTER.validate_json(items_json)
+    except ValidationError as e:
+        # detail stays a message string for the HTMX/JS callers; the
+        # submitted values are left out of it
+        problems = "; ".join(
+            "%s: %s" % (".".join(map(str, err["loc"])), err["msg"]) if err["loc"] else err["msg"]
+            for err in e.errors(include_url=False, include_input=False)
+        )
+        raise HTTPException(status_code=400, detail=f"Invalid items data: {problems}")
+    items = [(item.id, item.quantity) for item in items_data]
     
     # Create order
     order = await create_order(
@@ -98,13 +106,18 @@ async def my_orders(
     
     orders = await get_orders_by_customer(db, current_user["id"])
     
-    return templates.TemplateResponse(
-        "myorders.html",
-        {
-            "request": request,
-            "orders": orders,
-            "current_user": current_user
-        }
+    # Stream the page as it renders instead of building the whole body
+    # first. Starlette drives the sync generator from its threadpool; the
+    # template only reads columns and the eager-loaded order_items, so it's
+    # safe to finish after the DB session has been released.
+    page = templates.get_template("myorders.html").generate({
+        "request": request,
+        "orders": orders,
+        "current_user": current_user
+    })
+    return StreamingResponse(
+        (chunk.encode() for chunk in page),
+        media_type="text/html"
     )
 
 @router.get("/api/myorders")
@@ -125,14 +138,11 @@ async def assign_order_to_team(
     request: Request,
     order_id: int,
     team_member_id: int = Form(...),
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Assign order to team member (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     order = await assign_order(db, order_id, team_member_id)
     
     if not order:
@@ -153,6 +163,7 @@ async def assign_order_to_team(
 async def generate_delivery_otp(
     request: Request,
     order_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -174,14 +185,19 @@ async def generate_delivery_otp(
     
     otp, otp_expiry = result
     
-    # Send OTP via SMS
+    # Send OTP via SMS once the response is out; the Twilio call is a
+    # blocking HTTP request, so it runs in the threadpool, not on the loop
     if order.customer.phone:
-        twilio_client.send_otp_sms(order.customer.phone, otp, order.order_number)
+        background_tasks.add_task(
+            twilio_client.send_otp_sms, order.customer.phone, otp, order.order_number
+        )
     
-    return {
+    # Returned directly so FastAPI skips jsonable_encoder; orjson writes the
+    # datetime in the same ISO 8601 form isoformat() would
+    return ORJSONResponse({
         "message": "OTP generated and sent",
-        "otp_expiry": otp_expiry.isoformat()
-    }
+        "otp_expiry": otp_expiry
+    })
 
 @router.post("/api/orders/{order_id}/verify-otp")
 async def verify_delivery_otp(
@@ -214,22 +230,15 @@ async def admin_orders_list(
     request: Request,
     status: Optional[str] = None,
     page: int = 1,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Admin orders management page"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     skip = (page - 1) * 20
-    orders, total = await get_all_orders(db, skip=skip, limit=20, status=status)
     
-    # Get team members for assignment dropdown
-    from crud.user import get_users_by_role
-    team_members = await get_users_by_role(db, "team_member", limit=1000)
-    
-    # Get statistics
+    orders, total = await get_all_orders(db, skip=skip, limit=20, status=status)
+    team_members = await get_users_by_role(db, UserRole.TEAM_MEMBER, limit=1000)
     stats = await get_order_statistics(db)
     
     total_pages = (total + 19) // 20  # Ceiling division
@@ -1,21 +1,44 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse, StreamingResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Annotated, Optional
 
 from database import get_db
 from crud.service import (
-    get_all_services, get_service_by_id, create_service,
+    get_all_services_cached, get_service_by_id, create_service,
     update_service, delete_service, create_menu_item,
     get_menu_items_by_service, update_menu_item, delete_menu_item,
-    get_menu_item_by_id
+    get_menu_item_by_id, services_version
 )
-from core.security import get_current_user
+from core.templates import templates
+from schemas.schemas import ServiceBase, MenuItemBase
+from core.security import get_current_user, require_admin
+from models.models import User
 from utils.file_upload import save_upload_file
 
-router = APIRouter(tags=["services"])
-templates = Jinja2Templates(directory="templates")
+router = APIRouter(tags=["services"], default_response_class=ORJSONResponse)
+
+# Resolved once at import so page views skip TemplateResponse's per-request
+# name lookup
+SERVICES_TEMPLATE = templates.get_template("services.html")
+SERVICE_MENU_TEMPLATE = templates.get_template("service_menu.html")
+
+def catalogue_etag(version: str, current_user: User, page: str) -> str:
+    """Weak ETag for a catalogue page as rendered for this user; the user's
+    updated_at covers the profile fields the page shows"""
+    user_version = current_user.updated_at.timestamp() if current_user.updated_at else 0
+    return 'W/"svc-%s-%s-%s-%s"' % (version, current_user.id, user_version, page)
+
+def catalogue_headers(etag: str) -> dict:
+    """Caching headers for a catalogue page; always revalidated, and a match
+    costs only the version query, no catalogue read and no render"""
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def catalogue_not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 if the client already holds this version of the page"""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=catalogue_headers(etag))
+    return None
 
 @router.get("/services", response_class=HTMLResponse)
 async def services_list(
@@ -28,16 +51,18 @@ async def services_list(
     if not current_user:
         return RedirectResponse(url="/login", status_code=303)
     
-    services = await get_all_services(db)
+    etag = catalogue_etag(await services_version(db), current_user, "list")
+    not_modified = catalogue_not_modified(request, etag)
+    if not_modified:
+        return not_modified
     
-    return templates.TemplateResponse(
-        "services.html",
-        {
-            "request": request,
-            "services": services,
-            "current_user": current_user
-        }
-    )
+    services = await get_all_services_cached(db)
+    
+    return HTMLResponse(SERVICES_TEMPLATE.render({
+        "request": request,
+        "services": services,
+        "current_user": current_user
+    }), headers=catalogue_headers(etag))
 
 @router.get("/services/{service_id}", response_class=HTMLResponse)
 async def service_menu(
@@ -51,58 +76,56 @@ async def service_menu(
     if not current_user:
         return RedirectResponse(url="/login", status_code=303)
     
+    etag = catalogue_etag(await services_version(db), current_user, str(service_id))
+    not_modified = catalogue_not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    
     service = await get_service_by_id(db, service_id)
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     
     menu_items = await get_menu_items_by_service(db, service_id)
     
-    return templates.TemplateResponse(
-        "service_menu.html",
-        {
-            "request": request,
-            "service": service,
-            "menu_items": menu_items,
-            "current_user": current_user
-        }
-    )
+    return HTMLResponse(SERVICE_MENU_TEMPLATE.render({
+        "request": request,
+        "service": service,
+        "menu_items": menu_items,
+        "current_user": current_user
+    }), headers=catalogue_headers(etag))
 
 @router.get("/admin/services", response_class=HTMLResponse)
 async def admin_services_list(
     request: Request,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Admin services management page"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    services = await get_all_services(db, limit=1000)
-    
-    return templates.TemplateResponse(
-        "admin_services.html",
-        {
-            "request": request,
-            "services": services,
-            "current_user": current_user
-        }
+    services = await get_all_services_cached(db, limit=1000)
+    
+    # Up to a thousand rows; stream the page as it renders like /myorders
+    # does rather than building the whole body in memory first
+    page = templates.get_template("admin_services.html").generate({
+        "request": request,
+        "services": services,
+        "current_user": current_user
+    })
+    return StreamingResponse(
+        (chunk.encode() for chunk in page),
+        media_type="text/html"
     )
 
 @router.post("/admin/services")
 async def admin_create_service(
     request: Request,
-    name: str = Form(...),
-    description: Optional[str] = Form(None),
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    form: Annotated[ServiceBase, Form()],
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new service (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    service = await create_service(db, name, description)
+    service = await create_service(db, form.name, form.description)
     
     # HTMX response
     return templates.TemplateResponse(
@@ -117,17 +140,13 @@ async def admin_create_service(
 async def admin_update_service(
     request: Request,
     service_id: int,
-    name: str = Form(...),
-    description: Optional[str] = Form(None),
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    form: Annotated[ServiceBase, Form()],
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update service (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    update_data = {"name": name, "description": description}
+    update_data = form.model_dump()
     service = await update_service(db, service_id, update_data)
     
     if not service:
@@ -144,14 +163,11 @@ async def admin_update_service(
 @router.delete("/admin/services/{service_id}")
 async def admin_delete_service(
     service_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete service (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     success = await delete_service(db, service_id)
     
     if not success:
@@ -163,14 +179,11 @@ async def admin_delete_service(
 async def admin_service_menu_items(
     request: Request,
     service_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get menu items for a service (Admin)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     menu_items = await get_menu_items_by_service(db, service_id)
     
     return templates.TemplateResponse(
@@ -186,18 +199,13 @@ async def admin_service_menu_items(
 async def admin_create_menu_item(
     request: Request,
     service_id: int,
-    name: str = Form(...),
-    description: Optional[str] = Form(None),
-    price: float = Form(...),
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    form: Annotated[MenuItemBase, Form()],
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new menu item (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    menu_item = await create_menu_item(db, service_id, name, description, price)
+    menu_item = await create_menu_item(db, service_id, form.name, form.description, form.price)
     
     return templates.TemplateResponse(
         "partials/menu_item.html",
@@ -211,18 +219,13 @@ async def admin_create_menu_item(
 async def admin_update_menu_item(
     request: Request,
     item_id: int,
-    name: str = Form(...),
-    description: Optional[str] = Form(None),
-    price: float = Form(...),
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    form: Annotated[MenuItemBase, Form()],
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update menu item (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    update_data = {"name": name, "description": description, "price": price}
+    update_data = form.model_dump()
     menu_item = await update_menu_item(db, item_id, update_data)
     
     if not menu_item:
@@ -239,14 +242,11 @@ async def admin_update_menu_item(
 @router.delete("/admin/menu/{item_id}")
 async def admin_delete_menu_item(
     item_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete menu item (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     success = await delete_menu_item(db, item_id)
     
     if not success:
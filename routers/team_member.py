@@ -1,18 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Form, UploadFile, File
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
+from pydantic import TypeAdapter
 import json
+from datetime import date
 
 from database import get_db
 from crud.order import get_orders_by_team_member, get_order_by_id
 from crud.user import get_user_by_id
 from crud.session import get_user_sessions
+from schemas.schemas import OrderResponse
+from core.templates import templates
 from core.security import get_current_user
 
-router = APIRouter(tags=["team_member"])
-templates = Jinja2Templates(directory="templates")
+router = APIRouter(tags=["team_member"], default_response_class=ORJSONResponse)
+
+# Validates ORM rows straight into the response schema and serializes them
+# in pydantic-core, instead of FastAPI walking them with jsonable_encoder
+ORDERS_ADAPTER = TypeAdapter(List[OrderResponse])
+
+# Resolved once at import so page views skip TemplateResponse's per-request
+# name lookup
+TEAM_DASHBOARD_TEMPLATE = templates.get_template("team_member_dashboard.html")
 
 @router.get("/team/dashboard", response_class=HTMLResponse)
 async def team_member_dashboard(
@@ -25,26 +35,17 @@ async def team_member_dashboard(
     if not current_user or current_user.get("role") != "team_member":
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Get assigned orders
     orders = await get_orders_by_team_member(db, current_user["id"])
-    
-    # Get team member details
     team_member = await get_user_by_id(db, current_user["id"])
-    
-    # Get today's sessions
-    from datetime import date
     today_sessions, _ = await get_user_sessions(db, current_user["id"], date_from=date.today())
     
-    return templates.TemplateResponse(
-        "team_member_dashboard.html",
-        {
-            "request": request,
-            "orders": orders,
-            "team_member": team_member,
-            "today_sessions": today_sessions,
-            "current_user": current_user
-        }
-    )
+    return HTMLResponse(TEAM_DASHBOARD_TEMPLATE.render({
+        "request": request,
+        "orders": orders,
+        "team_member": team_member,
+        "today_sessions": today_sessions,
+        "current_user": current_user
+    }))
 
 @router.get("/api/team/orders")
 async def api_team_orders(
@@ -57,7 +58,10 @@ async def api_team_orders(
         raise HTTPException(status_code=403, detail="Not authorized")
     
     orders = await get_orders_by_team_member(db, current_user["id"])
-    return orders
+    return Response(
+        content=ORDERS_ADAPTER.dump_json(ORDERS_ADAPTER.validate_python(orders, from_attributes=True)),
+        media_type="application/json"
+    )
 
 @router.get("/team/orders/{order_id}")
 async def team_order_detail(
@@ -1,90 +1,98 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from pydantic import TypeAdapter
 
 from database import get_db
 from crud.user import get_all_users, get_users_by_role, get_customer_with_stats
 from crud.order import get_orders_by_customer
 from crud.session import get_user_sessions
-from schemas.schemas import UserRole
-from core.security import get_current_user
+from schemas.schemas import UserRole, UserResponse
+from core.templates import templates
+from core.security import require_admin
 
-router = APIRouter(tags=["users"])
-templates = Jinja2Templates(directory="templates")
+router = APIRouter(tags=["users"], default_response_class=ORJSONResponse)
+
+# Validates ORM rows straight into the response schema and serializes them
+# in pydantic-core, instead of FastAPI walking them with jsonable_encoder
+USERS_ADAPTER = TypeAdapter(List[UserResponse])
+
+# Resolved once at import so page views skip TemplateResponse's per-request
+# name lookup
+CUSTOMER_DETAIL_TEMPLATE = templates.get_template("customer_detail.html")
+
+# Customers per /api/customers page when paging by keyset (after_id)
+CUSTOMERS_PAGE_SIZE = 50
 
 @router.get("/customers", response_class=HTMLResponse)
 async def customers_list(
     request: Request,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """List all customers (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     customers = await get_users_by_role(db, UserRole.CUSTOMER, limit=1000)
     
-    return templates.TemplateResponse(
-        "customers_list.html",
-        {
-            "request": request,
-            "customers": customers,
-            "current_user": current_user
-        }
+    # Up to a thousand rows; stream the page as it renders like /myorders
+    # does rather than building the whole body in memory first
+    page = templates.get_template("customers_list.html").generate({
+        "request": request,
+        "customers": customers,
+        "current_user": current_user
+    })
+    return StreamingResponse(
+        (chunk.encode() for chunk in page),
+        media_type="text/html"
     )
 
 @router.get("/customers/{customer_id}", response_class=HTMLResponse)
 async def customer_detail(
     request: Request,
     customer_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Customer detail page (Admin only)"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    # Get customer with stats
     customer_data = await get_customer_with_stats(db, customer_id)
     if not customer_data:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    # Get customer orders
     orders = await get_orders_by_customer(db, customer_id, limit=50)
-    
-    # Get customer sessions
     sessions, _ = await get_user_sessions(db, customer_id, limit=50)
     
-    return templates.TemplateResponse(
-        "customer_detail.html",
-        {
-            "request": request,
-            "customer": customer_data["user"],
-            "stats": {
-                "total_orders": customer_data["total_orders"],
-                "total_spent": customer_data["total_spent"],
-                "last_order_date": customer_data["last_order_date"]
-            },
-            "orders": orders,
-            "sessions": sessions,
-            "current_user": current_user
-        }
-    )
+    return HTMLResponse(CUSTOMER_DETAIL_TEMPLATE.render({
+        "request": request,
+        "customer": customer_data["user"],
+        "stats": {
+            "total_orders": customer_data["total_orders"],
+            "total_spent": customer_data["total_spent"],
+            "last_order_date": customer_data["last_order_date"]
+        },
+        "orders": orders,
+        "sessions": sessions,
+        "current_user": current_user
+    }))
 
 @router.get("/api/customers")
 async def api_customers_list(
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    after_id: Optional[int] = None,
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
-    """API endpoint for customers list (HTMX)"""
+    """API endpoint for customers list (HTMX); with after_id, just the next
+    page in id order"""
     
-    if not current_user or current_user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
+    if after_id is None:
+        customers = await get_users_by_role(db, UserRole.CUSTOMER, limit=1000)
+    else:
+        customers = await get_users_by_role(
+            db, UserRole.CUSTOMER, limit=CUSTOMERS_PAGE_SIZE, after_id=after_id
+        )
     
-    customers = await get_users_by_role(db, UserRole.CUSTOMER, limit=1000)
-    
-    return customers
+    return Response(
+        content=USERS_ADAPTER.dump_json(USERS_ADAPTER.validate_python(customers, from_attributes=True)),
+        media_type="application/json"
+    )
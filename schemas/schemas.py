@@ -1,8 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field, validator, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, field_validator, ConfigDict
 from typing import Optional, List
 from datetime import datetime, date
 from enum import Enum
-import re
 
 class UserRole(str, Enum):
     CUSTOMER = "customer"
@@ -19,16 +18,22 @@ class OrderStatus(str, Enum):
 
 # ========== MOBILE AUTHENTICATION SCHEMAS ==========
 
+# Every byte except ASCII 0-9, for bytes.translate's delete argument
+NON_DIGIT_BYTES = bytes(b for b in range(256) if not 48 <= b <= 57)
+
 class MobileAuthBase(BaseModel):
     """Base schema for mobile authentication"""
-    @validator('mobile')
+    # check_fields=False: the field is declared on the subclasses
+    @field_validator('mobile', check_fields=False)
+    @classmethod
     def validate_mobile(cls, v):
         """Validate mobile number format"""
         if not v:
             raise ValueError('Mobile number is required')
         
-        # Remove any spaces or special characters
-        v = re.sub(r'\D', '', v)
+        # Remove any spaces or special characters (and any non-ASCII digits,
+        # which a \D regex would let through)
+        v = v.encode('ascii', 'ignore').translate(None, NON_DIGIT_BYTES).decode('ascii')
         
         # Check if it's 10 digits
         if len(v) != 10:
@@ -49,7 +54,8 @@ class UserCreate(MobileAuthBase):
     address: Optional[str] = None
     role: UserRole = UserRole.CUSTOMER
     
-    @validator('password')
+    @field_validator('password')
+    @classmethod
     def validate_password(cls, v):
         if len(v) < 6:
             raise ValueError('Password must be at least 6 characters long')
@@ -130,7 +136,8 @@ class PasswordChange(BaseModel):
     current_password: str = Field(..., description="Current password")
     new_password: str = Field(..., min_length=6, description="New password (min 6 characters)")
     
-    @validator('new_password')
+    @field_validator('new_password')
+    @classmethod
     def validate_new_password(cls, v):
         if len(v) < 6:
             raise ValueError('New password must be at least 6 characters long')
@@ -183,7 +190,8 @@ class MenuItemBase(BaseModel):
     description: Optional[str] = None
     price: float = Field(..., gt=0)
     
-    @validator('price')
+    @field_validator('price')
+    @classmethod
     def validate_price(cls, v):
         if v <= 0:
             raise ValueError('Price must be greater than 0')
@@ -205,6 +213,11 @@ class OrderItemCreate(BaseModel):
     menu_item_id: int
     quantity: int = Field(..., ge=1)
 
+class OrderItemIn(BaseModel):
+    """One cart line as posted in the order form's items_json"""
+    id: int
+    quantity: int = Field(..., ge=1)
+
 class OrderCreate(BaseModel):
     service_id: int
     address: str
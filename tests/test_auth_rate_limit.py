@@ -0,0 +1,50 @@
+from starlette.requests import Request
+import pytest
+
+import main
+
+
+def make_request(peer, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "client": (peer, 1234), "headers": headers})
+
+
+@pytest.fixture(autouse=True)
+def clear_failures():
+    main.auth_failures.clear()
+    yield
+    main.auth_failures.clear()
+
+
+def test_forwarded_for_ignored_from_untrusted_peer(monkeypatch):
+    monkeypatch.setattr(main, "TRUSTED_PROXIES", frozenset({"10.0.0.1"}))
+    assert main.client_ip(make_request("203.0.113.9", "198.51.100.7")) == "203.0.113.9"
+
+
+def test_forwarded_for_used_from_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(main, "TRUSTED_PROXIES", frozenset({"10.0.0.1"}))
+    # The leftmost hop is whatever the client sent and can't be trusted
+    request = make_request("10.0.0.1", "1.2.3.4, 198.51.100.7")
+    assert main.client_ip(request) == "198.51.100.7"
+
+
+def test_only_failures_count_towards_the_limit():
+    request = make_request("198.51.100.7")
+    for _ in range(main.AUTH_RATE_LIMIT * 2):
+        assert main.auth_rate_limited(request) is None
+
+    for _ in range(main.AUTH_RATE_LIMIT):
+        main.record_auth_failure(request)
+    response = main.auth_rate_limited(request)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+    # Other clients are unaffected
+    assert main.auth_rate_limited(make_request("198.51.100.8")) is None
+
+
+def test_failure_table_is_bounded(monkeypatch):
+    monkeypatch.setattr(main, "AUTH_RATE_MAX_CLIENTS", 3)
+    for i in range(5):
+        main.record_auth_failure(make_request(f"198.51.100.{i}"))
+    assert list(main.auth_failures) == ["198.51.100.2", "198.51.100.3", "198.51.100.4"]
@@ -0,0 +1,32 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import asyncio
+
+from crud.user import get_users_by_role
+from models.models import Base, User
+from schemas.schemas import UserRole
+
+
+async def customer_names(**kwargs):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as db:
+        for i, name in enumerate(["Carol", "Alice", "Bob"]):
+            db.add(User(
+                name=name, username=name.lower(), email=f"{name.lower()}@example.com",
+                phone=f"+1555000000{i}", password_hash="x", role="customer",
+            ))
+        await db.commit()
+        users = await get_users_by_role(db, UserRole.CUSTOMER, **kwargs)
+    await engine.dispose()
+    return [user.name for user in users]
+
+
+def test_users_by_role_are_alphabetical_by_default():
+    assert asyncio.run(customer_names()) == ["Alice", "Bob", "Carol"]
+
+
+def test_users_by_role_keyset_page_is_in_id_order():
+    assert asyncio.run(customer_names(after_id=1, limit=1)) == ["Alice"]
+    assert asyncio.run(customer_names(after_id=0)) == ["Carol", "Alice", "Bob"]
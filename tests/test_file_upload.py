@@ -0,0 +1,79 @@
+from fastapi import UploadFile
+from PIL import Image
+import asyncio
+import io
+import os
+import pytest
+
+from utils import file_upload
+from utils.file_upload import optimize_image
+
+
+def gps_exif():
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"
+    exif[0x8825] = {1: "N", 2: (51.0, 30.0, 0.0)}
+    return exif
+
+
+@pytest.fixture
+def small_jpeg(tmp_path):
+    return str(tmp_path / "photo.jpg")
+
+
+def test_small_jpeg_without_metadata_is_kept_as_uploaded(small_jpeg):
+    Image.new("RGB", (64, 64), "red").save(small_jpeg, "JPEG", quality=95)
+    with open(small_jpeg, "rb") as f:
+        original = f.read()
+
+    optimize_image(small_jpeg)
+
+    with open(small_jpeg, "rb") as f:
+        assert f.read() == original
+
+
+def test_small_jpeg_with_exif_is_stripped(small_jpeg):
+    Image.new("RGB", (64, 64), "red").save(small_jpeg, "JPEG", quality=95, exif=gps_exif())
+
+    optimize_image(small_jpeg)
+
+    with Image.open(small_jpeg) as img:
+        assert "exif" not in img.info
+        assert not img.getexif()
+
+
+def test_small_png_with_exif_is_stripped(tmp_path):
+    path = str(tmp_path / "photo.png")
+    Image.new("RGB", (64, 64), "red").save(path, "PNG", exif=gps_exif())
+
+    optimize_image(path)
+
+    with Image.open(path) as img:
+        img.load()
+        assert "exif" not in img.info
+
+
+def test_low_quality_jpeg_with_exif_is_stripped(small_jpeg, monkeypatch):
+    # Too big for the small-file passthrough, but already below JPEG_QUALITY
+    monkeypatch.setattr(file_upload, "OPTIMIZE_MIN_BYTES", 0)
+    Image.new("RGB", (64, 64), "red").save(small_jpeg, "JPEG", quality=60, exif=gps_exif())
+
+    optimize_image(small_jpeg)
+
+    with Image.open(small_jpeg) as img:
+        assert "exif" not in img.info
+
+
+@pytest.mark.parametrize("filename", ["a.b/c", "x.y/../../etc/passwd", "photo.exe", None])
+def test_saved_upload_extension_comes_from_sniffed_type(tmp_path, monkeypatch, filename):
+    monkeypatch.setattr(file_upload.settings, "UPLOAD_DIR", str(tmp_path))
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 16), "red").save(buffer, "PNG")
+    buffer.seek(0)
+    upload = UploadFile(buffer, filename=filename, size=len(buffer.getvalue()))
+
+    relative_path = asyncio.run(file_upload.save_upload_file(upload, "menu"))
+
+    stored = os.path.basename(relative_path)
+    assert stored.endswith(".png") and "/" not in stored
+    assert os.path.exists(tmp_path / "menu" / stored)
@@ -0,0 +1,89 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+import pytest
+
+from core.security import AuthHandler
+from database import get_db, get_sync_db
+from models.models import Base, Service, User
+from routers import services
+
+
+@pytest.fixture
+def client(tmp_path):
+    db_path = tmp_path / "test.db"
+    sync_engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(sync_engine)
+    SyncSession = sessionmaker(bind=sync_engine)
+    with SyncSession() as db:
+        db.add(User(
+            name="Test Customer", username="customer", email="customer@example.com",
+            phone="+15550000000", password_hash="x", role="customer",
+        ))
+        db.add(Service(name="Pizza", slug="pizza", description="Hot and fresh"))
+        db.commit()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    AsyncSessionTest = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    def override_sync_db():
+        with SyncSession() as db:
+            yield db
+
+    async def override_db():
+        async with AsyncSessionTest() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(services.router)
+    # Only the sessions are replaced; get_current_user itself runs for real
+    app.dependency_overrides[get_sync_db] = override_sync_db
+    app.dependency_overrides[get_db] = override_db
+
+    with TestClient(app) as test_client:
+        test_client.sync_session = SyncSession
+        yield test_client
+    sync_engine.dispose()
+
+
+def login(client):
+    client.cookies.set("access_token", AuthHandler.create_access_token({"sub": "customer"}))
+
+
+def test_services_list_sets_etag_for_logged_in_user(client):
+    login(client)
+    response = client.get("/services")
+    assert response.status_code == 200
+    assert "Pizza" in response.text
+    assert response.headers["ETag"].startswith('W/"svc-')
+
+
+def test_services_list_revalidates_with_etag(client):
+    login(client)
+    etag = client.get("/services").headers["ETag"]
+    response = client.get("/services", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_services_list_redirects_anonymous_user(client):
+    response = client.get("/services", follow_redirects=False)
+    assert response.status_code == 303
+    assert response.headers["location"] == "/login"
+
+
+def test_services_list_etag_changes_after_write_elsewhere(client):
+    login(client)
+    etag = client.get("/services").headers["ETag"]
+
+    # Another worker renames the service; this process's caches never saw it
+    with client.sync_session() as db:
+        db.query(Service).filter(Service.slug == "pizza").one().name = "Pasta"
+        db.commit()
+
+    response = client.get("/services", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Pasta" in response.text
+    assert response.headers["ETag"] != etag